@@ -1,30 +1,50 @@
 import argparse
+import asyncio
+import codecs
+import json
 import logging
 import mimetypes
 import os
 import random
 import signal
+import sqlite3
 import sys
 import time
-from typing import Dict, List, Optional, Tuple, Union
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 from ebooklib import epub
+from lxml import etree, html
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 # Константы
 BASE_URL = "https://freewebnovel.com"
-SAVE_INTERVAL = 5
+LOG_INTERVAL = 5
+MISSING_CONTENT_MARKER = b"Chapter content is missing or does not exist"
+# Результат download_chapter, когда у главы нет контента (книга закончилась),
+# в отличие от None при сбое запроса
+END_OF_BOOK: Mapping[str, str] = MappingProxyType({})
 DEFAULT_NOVEL = "shadow-slave"
 DEFAULT_START_CHAPTER = 1
 DEFAULT_MAX_CHAPTERS = 0
 DEFAULT_DELAY_SEC = 0.5
+DEFAULT_CONCURRENCY = 4
+POOL_MAXSIZE = 16
+CONNECT_TIMEOUT_SEC = 5.0
 DEFAULT_OUTPUT = "novel.epub"
 
 HEADERS = {
     'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36',
     'accept-language': 'en-US,en;q=0.9,ru;q=0.8',
+    # Только кодировки, которые urllib3 умеет распаковать (br/zstd при установленных модулях)
+    'accept-encoding': ACCEPT_ENCODING,
     'cache-control': 'max-age=0',
     'priority': 'u=0, i',
     'sec-cha-ua': '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
@@ -32,7 +52,38 @@ HEADERS = {
     'sec-cha-ua-mobile': '?0',
     'sec-fetch-user': '?1',
     'upgrade-Insecure-Requests': '1',
-    'dnt': '1'
+    'dnt': '1',
+    'connection': 'keep-alive'
+}
+
+
+@lru_cache(maxsize=4096)
+def _join(url: str) -> str:
+    """Кэшированный urljoin относительно BASE_URL."""
+    return urljoin(BASE_URL, url)
+
+
+def _has_class(name: str) -> str:
+    """Условие XPath, аналогичное CSS-селектору .name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _info_item(title: str) -> str:
+    """Путь к значению поля .m-info .txt .item с подписью title."""
+    return (f"//*[{_has_class('m-info')}]//*[{_has_class('txt')}]"
+            f"//*[{_has_class('item')}][.//span[@title='{title}']]//*[{_has_class('right')}]")
+
+
+# XPath-выражения страницы обзора компилируются один раз при загрузке модуля
+METADATA_XPATHS = {
+    key: etree.XPath(path) for key, path in {
+        'title': f"//*[{_has_class('m-info')}]//*[{_has_class('m-desc')}]//h1[{_has_class('tit')}]",
+        'author': _info_item('Author') + "//a",
+        'genres': _info_item('Genre') + "//a",
+        'status': _info_item('Status'),
+        'description': f"//*[{_has_class('m-info')}]//*[{_has_class('inner')}]//p",
+        'cover': f"//*[{_has_class('m-info')}]//*[{_has_class('m-book1')}]//*[{_has_class('pic')}]//img"
+    }.items()
 }
 
 logger = logging.getLogger(__name__)
@@ -52,20 +103,32 @@ class NovelDownloader:
             start_chapter: int = DEFAULT_START_CHAPTER,
             max_chapters: int = DEFAULT_MAX_CHAPTERS,
             output_file: str = DEFAULT_OUTPUT,
-            request_delay: float = DEFAULT_DELAY_SEC
+            request_delay: float = DEFAULT_DELAY_SEC,
+            concurrency: int = DEFAULT_CONCURRENCY
     ):
         if output_file == DEFAULT_OUTPUT:
             self.output_file = f"{novel_name}.epub"
         else:
             self.output_file = output_file
         self.temp_file = f"{self.output_file}.tmp"
+        self.journal_file = f"{self.temp_file}.db"
+        self.journal: Optional[sqlite3.Connection] = None
 
         self.novel_name = novel_name
+        self._chapter_prefix = f"{BASE_URL}/novel/{novel_name}/chapter-"
         self.start_chapter = start_chapter
         self.max_chapters = max_chapters
         self.request_delay = request_delay
+        self.concurrency = max(1, concurrency)
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
+        # Все запросы идут на один хост: переиспользуем TCP/TLS соединения
+        # Пул не меньше числа параллельных загрузчиков, иначе лишние соединения закрываются
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(POOL_MAXSIZE, self.concurrency),
+            max_retries=0
+        ))
         self.metadata = {}
         self.should_stop = False
         self._register_signal_handlers()
@@ -88,8 +151,10 @@ class NovelDownloader:
             params: Optional[dict] = None,
             max_retries: int = 5,
             initial_delay: float = 3.0,
-            backoff_factor: float = 2.0,
-            timeout: float = 30.0
+            backoff_factor: float = 3.0,
+            max_delay: float = 120.0,
+            timeout: Union[float, Tuple[float, float]] = (CONNECT_TIMEOUT_SEC, 30.0),
+            stream: bool = False
     ) -> Optional[requests.Response]:
         """
         Выполняет HTTP-запрос с повторными попытками при сбоях.
@@ -101,34 +166,37 @@ class NovelDownloader:
         - params: параметры запроса
         - max_retries: максимальное количество попыток
         - initial_delay: начальная задержка (сек)
-        - backoff_factor: множитель экспоненциальной задержки
-        - timeout: таймаут запроса
+        - backoff_factor: множитель верхней границы следующей задержки (decorrelated jitter)
+        - max_delay: максимальная задержка между попытками (сек)
+        - timeout: таймаут запроса или пара (подключение, чтение)
+        - stream: не загружать тело ответа сразу (вызывающий код закрывает ответ сам)
         
         Возвращает: Response объект или None при ошибке
         """
         attempt = 0
         current_delay = initial_delay
 
-        # Используем заголовки сессии по умолчанию
-        request_headers = self.session.headers.copy()
-        if headers:
-            request_headers.update(headers)
-
         while attempt <= max_retries:
             attempt += 1
+            retry_after = None
             try:
                 response = self.session.request(
                     method,
                     url,
-                    headers=request_headers,
+                    headers=headers,
                     params=params,
-                    timeout=timeout
+                    timeout=timeout,
+                    stream=stream
                 )
 
                 # Проверяем статус код
                 if response.status_code == 200:
                     return response
 
+                # Ответ на условный запрос: ресурс не изменился
+                if response.status_code == 304:
+                    return response
+
                 # Обработка специфичных ошибок
                 if response.status_code == 404:
                     logger.info(f"Resource({url}) not found: {response.reason}")
@@ -139,13 +207,21 @@ class NovelDownloader:
 
                 if response.status_code in (429, 503):
                     logger.info(f"Too many requests (status code {response.status_code})")
+                    retry_after = self._parse_retry_after(response.headers.get('Retry-After'))
 
                 if 400 <= response.status_code < 500:
                     logger.info(f"Client error ({response.status_code}): {url}")
+                    # Повтор имеет смысл только для таймаута и ограничения частоты
+                    if response.status_code not in (408, 429):
+                        response.close()
+                        return None
 
                 if 500 <= response.status_code < 600:
                     logger.info(f"Server error ({response.status_code}): {url}")
 
+                # Возвращаем соединение в пул перед повтором
+                response.close()
+
             except requests.exceptions.RequestException as e:
                 error = f"{type(e).__name__} {e}"
 
@@ -157,64 +233,136 @@ class NovelDownloader:
                     logger.info(f"Request error ({error}): {url}")
 
             if attempt < max_retries:
-                jitter = 0.1 * current_delay * random.random()
-                sleep_time = current_delay + jitter
+                if retry_after is None:
+                    # Decorrelated jitter, если сервер не указал время повтора сам
+                    current_delay = min(max_delay, random.uniform(initial_delay, current_delay * backoff_factor))
+                    sleep_time = current_delay
+                else:
+                    # Retry-After заменяет текущую задержку: следующий шаг отсчитывается от неё
+                    sleep_time = min(max_delay, retry_after)
+                    current_delay = max(initial_delay, sleep_time)
 
                 logger.info(f"Retry in {sleep_time:.1f} sec (attempt {attempt}/{max_retries})")
                 time.sleep(sleep_time)
-
-                current_delay *= backoff_factor
             else:
                 logger.info(f"Maximum number of attempts exceeded ({max_retries}) for {url}")
 
         return None
 
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Разбирает заголовок Retry-After (секунды или HTTP-дата)."""
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def _load_cached(self, url: str) -> Optional[Dict[str, Union[str, bytes]]]:
+        """Возвращает сохранённый в журнале ответ для URL."""
+        if self.journal is None:
+            return None
+
+        row = self.journal.execute(
+            "SELECT etag, last_modified, content_type, body FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        etag, last_modified, content_type, body = row
+        return {'etag': etag, 'last_modified': last_modified, 'content_type': content_type, 'body': body}
+
+    @staticmethod
+    def _conditional_headers(cached: Optional[Dict[str, Union[str, bytes]]]) -> dict:
+        """Заголовки условного запроса по сохранённым валидаторам."""
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def _save_cached(self, url: str, response: requests.Response, body: bytes) -> None:
+        """Сохраняет тело ответа и его валидаторы (ETag/Last-Modified) в журнал."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if self.journal is None or not (etag or last_modified):
+            return
+
+        self.journal.execute(
+            "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, content_type, body) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, response.headers.get('Content-Type', ''), body)
+        )
+        self.journal.commit()
+
     def fetch_metadata(self) -> Optional[Dict[str, Union[str, List[str]]]]:
         """Получает метаданные книги со страницы обзора."""
         url = f"{BASE_URL}/novel/{self.novel_name}"
         try:
-            response = self.safe_request(url, timeout=15)
+            cached = self._load_cached(url)
+            response = self.safe_request(url, headers=self._conditional_headers(cached),
+                                         timeout=(CONNECT_TIMEOUT_SEC, 15))
             if response is None:
                 return None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            if response.status_code == 304 and cached:
+                logger.info("Metadata not modified, using cached copy")
+                self.metadata = json.loads(cached['body'])
+                return self.metadata
 
-            SELECTORS = {
-                'title': '.m-info .m-desc h1.tit',
-                'author': '.m-info .txt .item:has(span[title="Author"]) .right a',
-                'genres': '.m-info .txt .item:has(span[title="Genre"]) .right a',
-                'status': '.m-info .txt .item:has(span[title="Status"]) .right',
-                'description': '.m-info .inner p',
-                'cover': '.m-info .m-book1 .pic img'
-            }
+            # Неизвестная кодировка в заголовке (charset=none и т.п.) заменяется на utf-8
+            encoding = response.encoding or 'utf-8'
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                encoding = 'utf-8'
+
+            root = html.fromstring(response.content, parser=html.HTMLParser(encoding=encoding))
 
             self.metadata = {
-                'title': self._get_text(soup, SELECTORS['title']),
-                'author': self._get_text(soup, SELECTORS['author']) or "Unknown Author",
-                'genres': [a.text.strip() for a in soup.select(SELECTORS['genres'])],
-                'status': self._get_text(soup, SELECTORS['status']),
-                'description': ''.join(str(p) for p in soup.select(SELECTORS['description'])),
-                'cover_url': self._get_attr(soup, SELECTORS['cover'], 'src')
+                'title': self._get_text(root, METADATA_XPATHS['title']),
+                'author': self._get_text(root, METADATA_XPATHS['author']) or "Unknown Author",
+                'genres': [a.text_content().strip() for a in METADATA_XPATHS['genres'](root)],
+                'status': self._get_text(root, METADATA_XPATHS['status']),
+                'description': ''.join(
+                    html.tostring(p, encoding='unicode', with_tail=False)
+                    for p in METADATA_XPATHS['description'](root)
+                ),
+                'cover_url': self._get_attr(root, METADATA_XPATHS['cover'], 'src')
             }
 
             if self.metadata['cover_url']:
-                self.metadata['cover_url'] = urljoin(BASE_URL, self.metadata['cover_url'])
+                self.metadata['cover_url'] = _join(self.metadata['cover_url'])
+
+            if response.status_code == 200:
+                self._save_cached(url, response, json.dumps(self.metadata).encode('utf-8'))
 
             return self.metadata
 
-        except (requests.RequestException, ValueError) as e:
+        except (requests.RequestException, ValueError, etree.LxmlError) as e:
             logger.info(f"[ERROR] Metadata fetch failed: {type(e).__name__} - {str(e)}")
             return None
 
-    def _get_text(self, soup: BeautifulSoup, selector: str) -> Optional[str]:
-        """Извлекает текст из элемента по CSS-селектору."""
-        element = soup.select_one(selector)
-        return element.text.strip() if element else None
+    def _get_text(self, root: html.HtmlElement, xpath: etree.XPath) -> Optional[str]:
+        """Извлекает текст первого элемента по скомпилированному XPath."""
+        elements = xpath(root)
+        return elements[0].text_content().strip() if elements else None
 
-    def _get_attr(self, soup: BeautifulSoup, selector: str, attr: str) -> Optional[str]:
-        """Извлекает атрибут из элемента по CSS-селектору."""
-        element = soup.select_one(selector)
-        return element.get(attr) if element else None
+    def _get_attr(self, root: html.HtmlElement, xpath: etree.XPath, attr: str) -> Optional[str]:
+        """Извлекает атрибут первого элемента по скомпилированному XPath."""
+        elements = xpath(root)
+        return elements[0].get(attr) if elements else None
 
     def _create_epub(self) -> epub.EpubBook:
         """Создает базовую структуру EPUB книги."""
@@ -244,17 +392,29 @@ class NovelDownloader:
     def _add_cover(self, book: epub.EpubBook, cover_url: str) -> None:
         """Добавляет обложку в EPUB."""
         try:
-            response = self.safe_request(cover_url, timeout=10)
+            cached = self._load_cached(cover_url)
+            response = self.safe_request(cover_url, headers=self._conditional_headers(cached),
+                                         timeout=(CONNECT_TIMEOUT_SEC, 10), stream=True)
             if response is None:
                 return
 
-            content_type = response.headers.get('Content-Type', '')
-            if not content_type.startswith('image/'):
-                logger.info(f"[WARN] Invalid cover content type: {content_type}")
-                return
+            with response:
+                if response.status_code == 304 and cached:
+                    content_type, cover = cached['content_type'], cached['body']
+                else:
+                    content_type, cover = response.headers.get('Content-Type', ''), None
+
+                if not content_type.startswith('image/'):
+                    logger.info(f"[WARN] Invalid cover content type: {content_type}")
+                    return
+
+                if cover is None:
+                    # Тело читается из сокета один раз, без промежуточной копии response.content
+                    cover = response.raw.read(decode_content=True)
+                    self._save_cached(cover_url, response, cover)
 
-            ext = mimetypes.guess_extension(content_type) or '.jpg'
-            book.set_cover(f"cover{ext}", response.content)
+                ext = mimetypes.guess_extension(content_type) or '.jpg'
+                book.set_cover(f"cover{ext}", cover)
         except Exception as e:
             logger.info(f"[ERROR] Cover download failed: {type(e).__name__} - {str(e)}")
 
@@ -287,21 +447,22 @@ class NovelDownloader:
         </html>"""
         return html
 
-    def _process_chapter_content(self, content: Tag) -> Tag:
+    def _process_chapter_content(self, content: LexborNode) -> LexborNode:
         """Очищает и преобразует контент главы."""
         # Удаление рекламных элементов
-        for element in content.find_all(['script', 'ins', 'div.ad']):
+        for element in content.css('script, ins, div.ad'):
             element.decompose()
 
         # Фикс относительных URL изображений
-        for img in content.find_all('img', src=True):
-            img['src'] = urljoin(BASE_URL, img['src'])
+        for img in content.css('img[src]'):
+            img.attrs['src'] = _join(img.attrs['src'])
 
-        for element in content.contents[:4]:
+        for element in list(content.iter(include_text=True))[:4]:
             try:
-                if isinstance(element, Tag) and len(element.contents) > 1:
-                    for inner_element in element.contents:
-                        if inner_element.text.lower().strip().startswith("chapter"):
+                inner_elements = list(element.iter(include_text=True))
+                if element.tag != '-text' and len(inner_elements) > 1:
+                    for inner_element in inner_elements:
+                        if inner_element.text().lower().strip().startswith("chapter"):
                             inner_element.decompose()
             except Exception as e:
                 print(f"[ERROR] {type(e).__name__} - {str(e)}")
@@ -309,40 +470,47 @@ class NovelDownloader:
 
         return content
 
-    def download_chapter(self, chapter_num: int) -> Optional[Dict[str, str]]:
-        """Загружает и обрабатывает одну главу."""
-        url = f"{BASE_URL}/novel/{self.novel_name}/chapter-{chapter_num}"
+    def download_chapter(self, chapter_num: int) -> Optional[Mapping[str, str]]:
+        """Загружает и обрабатывает одну главу.
+
+        Возвращает данные главы, END_OF_BOOK для страницы-заглушки или 404,
+        или None, если запрос не удался или страница не похожа на главу.
+        """
+        url = self._chapter_prefix + str(chapter_num)
 
         try:
             # Устанавливаем Referer для последовательности глав
-            headers = {'Referer': f"{BASE_URL}/novel/{self.novel_name}/chapter-{chapter_num-1}"} if chapter_num > 1 else {}
+            headers = {'Referer': self._chapter_prefix + str(chapter_num - 1)} if chapter_num > 1 else {}
 
-            response = self.safe_request(url, headers=headers, timeout=30, initial_delay=10, max_retries=10)
+            response = self.safe_request(url, headers=headers, timeout=(CONNECT_TIMEOUT_SEC, 30), initial_delay=10, max_retries=10)
             if response is None:
                 return None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            content_div = soup.find('div', class_='txt')
-            article_div = soup.find('div', id='article')
-
-            if (not content_div
-                or (article_div and article_div.text ==
-                    "Chapter content is missing or does not exist! Please try again later!")):
+            # Конец книги: 404 или страница-заглушка, распознаваемая по сырым байтам без построения дерева
+            if response.status_code == 404 or response.content.find(MISSING_CONTENT_MARKER) != -1:
                 logger.info(f"[WARN] No content found in chapter {chapter_num}")
+                return END_OF_BOOK
+
+            tree = LexborHTMLParser(response.content)
+            content_node = tree.css_first('div.txt')
+
+            # Неожиданная разметка (проверка на бота, техработы): прогресс сохраняется
+            if not content_node:
+                logger.info(f"[WARN] Unexpected page layout in chapter {chapter_num}")
                 return None
 
-            content = self._process_chapter_content(content_div)
+            content = self._process_chapter_content(content_node)
 
-            title_tag = soup.find('span', class_='chapter')
-            if title_tag:
-                title = title_tag.text.strip()
-                title_tag.decompose()
+            title_node = content_node.css_first('span.chapter') or tree.css_first('span.chapter')
+            if title_node:
+                title = title_node.text().strip()
+                title_node.decompose()
             else:
                 title = f"Chapter {chapter_num}"
 
             return {
                 'title': title,
-                'content': str(content),
+                'content': content.html,
                 'file_name': f'chapter_{chapter_num}.xhtml'
             }
 
@@ -350,6 +518,12 @@ class NovelDownloader:
             logger.info(f"[ERROR] Chapter {chapter_num} download failed: {type(e).__name__} - {str(e)}")
             return None
 
+    # Неизменные части разметки главы собираются один раз
+    _CHAPTER_HEAD = b'<html><head><meta charset="utf-8"/><title>'
+    _CHAPTER_MID = b'</title></head><body><h1>'
+    _CHAPTER_BODY = b'</h1><div class="content">'
+    _CHAPTER_TAIL = b'</div></body></html>'
+
     def generate_epub_chapter(self, chapter_data: Dict[str, str]) -> epub.EpubHtml:
         """Создает объект главы EPUB из данных."""
         chapter = epub.EpubHtml(
@@ -357,29 +531,95 @@ class NovelDownloader:
             file_name=chapter_data['file_name'],
             lang='en'
         )
-        chapter.content = f"""
-                <html>
-                    <head><title>{chapter_data['title']}</title></head>
-                    <body>
-                        <h1>{chapter_data['title']}</h1>
-                        <div class="content">{chapter_data['content']}</div>
-                    </body>
-                </html>
-                """
+        title = chapter_data['title'].encode('utf-8')
+        chapter.content = b''.join((
+            self._CHAPTER_HEAD, title,
+            self._CHAPTER_MID, title,
+            self._CHAPTER_BODY, chapter_data['content'].encode('utf-8'),
+            self._CHAPTER_TAIL
+        ))
         return chapter
 
-    def save_progress(self, book: epub.EpubBook) -> bool:
-        """Сохраняет текущий прогресс во временный файл."""
-        try:
-            epub.write_epub(self.temp_file, book, {})
-            return True
-        except Exception as e:
-            logger.info(f"[ERROR] Progress saving error: {type(e).__name__} - {str(e)}")
-            return False
+    def open_journal(self) -> None:
+        """Открывает журнал скачанных глав (SQLite рядом с временным файлом)."""
+        self.journal = sqlite3.connect(self.journal_file)
+        self.journal.execute("PRAGMA journal_mode=WAL")
+        self.journal.execute("PRAGMA synchronous=NORMAL")
+        self.journal.execute(
+            "CREATE TABLE IF NOT EXISTS chapters ("
+            "num INTEGER PRIMARY KEY, title TEXT NOT NULL, file_name TEXT NOT NULL, content TEXT NOT NULL)"
+        )
+        self.journal.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT, body BLOB NOT NULL)"
+        )
+        self.journal.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        # Журнал другой новеллы с тем же выходным файлом не продолжаем
+        row = self.journal.execute("SELECT value FROM meta WHERE key = 'novel_name'").fetchone()
+        if row is not None and row[0] != self.novel_name:
+            logger.info(f"[WARN] Journal belongs to novel '{row[0]}', discarding its progress")
+            self.journal.execute("DELETE FROM chapters")
+            self.journal.execute("DELETE FROM http_cache")
+        self.journal.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('novel_name', ?)", (self.novel_name,)
+        )
+        self.journal.commit()
+
+    def close_journal(self, remove: bool = False) -> None:
+        """Закрывает журнал и при необходимости удаляет его файлы."""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+        if remove:
+            for path in (self.journal_file, f"{self.journal_file}-wal", f"{self.journal_file}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def has_saved_chapters(self) -> bool:
+        """Проверяет, есть ли в журнале хотя бы одна глава."""
+        return self.journal.execute("SELECT 1 FROM chapters LIMIT 1").fetchone() is not None
+
+    def save_chapter(self, chapter_num: int, chapter_data: Mapping[str, str]) -> None:
+        """Записывает главу в журнал."""
+        self.journal.execute(
+            "INSERT OR REPLACE INTO chapters (num, title, file_name, content) VALUES (?, ?, ?, ?)",
+            (chapter_num, chapter_data['title'], chapter_data['file_name'], chapter_data['content'])
+        )
+        self.journal.commit()
+
+    def load_saved_chapters(self) -> List[Dict[str, Union[int, str]]]:
+        """Возвращает сохранённые главы, идущие подряд начиная со start_chapter."""
+        rows = self.journal.execute(
+            "SELECT num, title, file_name FROM chapters WHERE num >= ? ORDER BY num",
+            (self.start_chapter,)
+        )
+
+        chapters = []
+        for num, title, file_name in rows:
+            # Главы после пропуска не учитываются: загрузка продолжится с первой недостающей
+            if num != self.start_chapter + len(chapters):
+                break
+            chapters.append({'num': num, 'title': title, 'file_name': file_name})
+        return chapters
 
     def finalize_epub(self, book: epub.EpubBook) -> bool:
-        """Финализирует EPUB и переименовывает временный файл."""
+        """Собирает EPUB из журнала глав и переименовывает временный файл."""
         try:
+            chapter_count = len(self.load_saved_chapters())
+            rows = self.journal.execute(
+                "SELECT title, file_name, content FROM chapters WHERE num >= ? AND num < ? ORDER BY num",
+                (self.start_chapter, self.start_chapter + chapter_count)
+            )
+            for title, file_name, content in rows:
+                chapter_data = {'title': title, 'content': content, 'file_name': file_name}
+
+                epub_chapter = self.generate_epub_chapter(chapter_data)
+                book.add_item(epub_chapter)
+                book.toc.append(epub_chapter)
+                book.spine.append(epub_chapter)
+
             # Добавляем навигацию
             book.add_item(epub.EpubNcx())
             book.add_item(epub.EpubNav())
@@ -396,14 +636,40 @@ class NovelDownloader:
             logger.info(f"[ERROR] EPUB finalizing error: {type(e).__name__} - {str(e)}")
             return False
 
-    def run(self) -> None:
+    async def _fetch_chapter(self, chapter_num: int) -> Optional[Mapping[str, str]]:
+        """Загружает главу в рабочем потоке, соблюдая паузу между запросами."""
+        if self.should_stop:
+            return None
+
+        chapter_data = await asyncio.to_thread(self.download_chapter, chapter_num)
+        await asyncio.sleep(self.request_delay)
+        return chapter_data
+
+    def _start_window(self, first_chapter: int, chapter_count: int) -> Optional[Tuple[range, asyncio.Future]]:
+        """Запускает загрузку окна глав; возвращает None, если загружать больше нечего."""
+        if self.should_stop or (self.max_chapters and chapter_count >= self.max_chapters):
+            return None
+
+        window = self.concurrency
+        if self.max_chapters:
+            window = min(window, self.max_chapters - chapter_count)
+        chapter_nums = range(first_chapter, first_chapter + window)
+
+        return chapter_nums, asyncio.gather(*(self._fetch_chapter(num) for num in chapter_nums))
+
+    async def run(self) -> None:
         """Основной рабочий процесс."""
         logger.info(f"Starting download: {self.novel_name}")
         start_time = time.time()
 
+        # Журнал открывается первым: в нём же кэш страницы обзора и обложки
+        self.open_journal()
+
         # Получение метаданных
         if not self.fetch_metadata():
             logger.info("Aborting: Failed to fetch metadata")
+            # Журнал без глав (например, при опечатке в --novel) не оставляем
+            self.close_journal(remove=not self.has_saved_chapters())
             return
 
         # Создание EPUB
@@ -417,44 +683,68 @@ class NovelDownloader:
         book.toc.append(epub.Link(desc_page.file_name, 'Description', 'desc'))
         book.spine.append(desc_page)
 
-        # Загрузка глав
-        chapter_count = 0
+        # Продолжение прерванной загрузки
+        saved_chapters = self.load_saved_chapters()
+        chapter_count = len(saved_chapters)
         current_chapter = self.start_chapter
+        if saved_chapters:
+            current_chapter = saved_chapters[-1]['num'] + 1
+            logger.info(f"Resuming from chapter {current_chapter} ({chapter_count} chapters already saved)")
 
+        book_complete = False
+        next_window = self._start_window(current_chapter, chapter_count)
         try:
-            while not self.should_stop and (self.max_chapters == 0 or chapter_count < self.max_chapters):
-                chapter_data = self.download_chapter(current_chapter)
-                if not chapter_data:
-                    logger.info(f"Stopping at chapter {current_chapter}")
-                    break
-
-                epub_chapter = self.generate_epub_chapter(chapter_data)
-                book.add_item(epub_chapter)
-                book.toc.append(epub_chapter)
-                book.spine.append(epub_chapter)
-
-                chapter_count += 1
-                current_chapter += 1
-                time.sleep(self.request_delay)
-
-                # Промежуточное сохранение
-                if chapter_count % SAVE_INTERVAL == 0:
-                    self.save_progress(book)
-                    logger.info(f"Downloaded {chapter_count} chapters...")
+            while next_window:
+                chapter_nums, pending = next_window
+                results = await pending
+
+                # Следующее окно загружается, пока сохраняются главы текущего
+                next_window = None
+                if all(result is not None and result is not END_OF_BOOK for result in results):
+                    next_window = self._start_window(chapter_nums.stop, chapter_count + len(chapter_nums))
+
+                # Главы добавляются строго по порядку номеров
+                for chapter_num, chapter_data in zip(chapter_nums, results):
+                    if chapter_data is END_OF_BOOK:
+                        logger.info(f"Stopping at chapter {chapter_num}")
+                        book_complete = True
+                        break
+                    if chapter_data is None:
+                        if not self.should_stop:
+                            logger.info(f"[ERROR] Chapter {chapter_num} could not be downloaded, stopping")
+                        break
+
+                    self.save_chapter(chapter_num, chapter_data)
+
+                    chapter_count += 1
+
+                    if chapter_count % LOG_INTERVAL == 0:
+                        logger.info(f"Downloaded {chapter_count} chapters...")
+
+            if self.max_chapters and chapter_count >= self.max_chapters:
+                book_complete = True
         finally:
-            self.save_progress(book)
+            if next_window:
+                next_window[1].cancel()
+
             # Финализация EPUB
             if self.finalize_epub(book):
                 elapsed = time.time() - start_time
                 logger.info(f"Successful saved: {os.path.abspath(self.output_file)}")
                 logger.info(f"Chapters downloaded: {chapter_count} | Time: {elapsed:.2f}с")
 
-                # Удаляем временный файл при успехе
+                # Удаляем временные файлы при успехе
                 if os.path.exists(self.temp_file):
                     os.remove(self.temp_file)
+
+                # Пока книга не скачана до конца, главы остаются для продолжения загрузки
+                if not book_complete:
+                    logger.info(f"Progress kept for resume: {os.path.abspath(self.journal_file)}")
+                self.close_journal(remove=book_complete)
             else:
-                logger.info("A temporary file with progress has been saved.:")
-                logger.info(f"  {os.path.abspath(self.temp_file)}")
+                self.close_journal()
+                logger.info("Downloaded chapters have been saved to:")
+                logger.info(f"  {os.path.abspath(self.journal_file)}")
 
 
 def main():
@@ -473,6 +763,8 @@ def main():
                         help='Выходной EPUB-файл')
     parser.add_argument('-d', '--delay', type=float, default=DEFAULT_DELAY_SEC,
                         help='Задержка между запросами (сек)')
+    parser.add_argument('-c', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Количество глав, загружаемых одновременно')
 
     args = parser.parse_args()
 
@@ -481,9 +773,10 @@ def main():
         start_chapter=args.start,
         max_chapters=args.max,
         output_file=args.output,
-        request_delay=args.delay
+        request_delay=args.delay,
+        concurrency=args.concurrency
     )
-    downloader.run()
+    asyncio.run(downloader.run())
 
 
 if __name__ == "__main__":